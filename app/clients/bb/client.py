@@ -1,9 +1,12 @@
 """BlueBubbles API Client."""
 
+from collections.abc import Mapping
+from types import MappingProxyType
+
 import httpx
 from pydantic import SecretStr
 
-from app.settings import settings
+from app.settings import get_settings
 
 from .message import MessageClient
 
@@ -17,11 +20,24 @@ class BBClient:
         password: SecretStr | None = None,
     ) -> None:
         """Initialize the BlueBubbles client."""
-        self.url = url or settings.bb_url
-        self.password = password or settings.bb_password
+        self.url = url or get_settings().bb_url
+        self.password = password or get_settings().bb_password
         self._message: MessageClient | None = None
-        # Create a single httpx client instance
-        self.http_client = httpx.Client(timeout=30.0)
+        # Resolved once; read-only so callers can't mutate the shared params
+        self._auth_params: Mapping[str, str] = MappingProxyType(
+            {"password": self.password.get_secret_value()},
+        )
+        # Create a single pooled httpx client instance, closed on app shutdown.
+        # Requests use paths relative to the mounted base URL, and bodies are
+        # pre-serialized with orjson, so the JSON content type is set once here
+        # rather than on every request.
+        self.http_client = httpx.AsyncClient(
+            base_url=self.url,
+            headers={"Content-Type": "application/json"},
+            timeout=30.0,
+            limits=httpx.Limits(max_keepalive_connections=20, max_connections=100),
+            http2=True,
+        )
 
     @property
     def message(self) -> MessageClient:
@@ -30,10 +46,10 @@ class BBClient:
             self._message = MessageClient(self)
         return self._message
 
-    def get_auth_params(self) -> dict[str, str]:
+    def get_auth_params(self) -> Mapping[str, str]:
         """Get the authentication parameters for requests."""
-        return {"password": self.password.get_secret_value()}
+        return self._auth_params
 
-    def __del__(self) -> None:
-        """Clean up the HTTP client when the instance is destroyed."""
-        self.http_client.close()
+    async def aclose(self) -> None:
+        """Close the underlying HTTP client."""
+        await self.http_client.aclose()
@@ -1,17 +1,41 @@
 """Message-related endpoints for BlueBubbles API."""
 
+import logging
 from typing import TYPE_CHECKING, Annotated, Any, Literal
-from uuid import uuid4
 
 import httpx
-from humps import camelize
-from pydantic import UUID4, Field, validate_call
+import orjson
+from pydantic import Field, TypeAdapter
 
-from app.logger import log
+from app.logger import LOG_LEVEL, log
+from app.models.bb.api import next_temp_guid
 
 if TYPE_CHECKING:
+    from collections.abc import Mapping
+
     from .client import BBClient
 
+SendMethod = Literal["private-api", "apple-script"]
+EffectId = Literal[
+    "com.apple.MobileSMS.expressivesend.gentle",
+    "com.apple.MobileSMS.expressivesend.impact",
+    "com.apple.MobileSMS.expressivesend.invisibleink",
+    "com.apple.MobileSMS.expressivesend.loud",
+    "com.apple.messages.effect.CKConfettiEffect",
+    "com.apple.messages.effect.CKEchoEffect",
+    "com.apple.messages.effect.CKFireworksEffect",
+    "com.apple.messages.effect.CKHappyBirthdayEffect",
+    "com.apple.messages.effect.CKHeartEffect",
+    "com.apple.messages.effect.CKLasersEffect",
+    "com.apple.messages.effect.CKShootingStarEffect",
+    "com.apple.messages.effect.CKSparklesEffect",
+    "com.apple.messages.effect.CKSpotlightEffect",
+]
+
+# Built once at import so send_text only pays for a single validator call
+_METHOD_ADAPTER: TypeAdapter[SendMethod] = TypeAdapter(SendMethod)
+_EFFECT_ID_ADAPTER: TypeAdapter[EffectId] = TypeAdapter(EffectId)
+
 
 class MessageClient:
     """Client for message-related endpoints."""
@@ -20,8 +44,7 @@ class MessageClient:
         """Initialize the message client."""
         self.client: BBClient = client
 
-    @validate_call
-    def send_text(  # noqa: PLR0913
+    async def send_text(  # noqa: PLR0913
         self,
         chat_guid: Annotated[
             str,
@@ -37,16 +60,16 @@ class MessageClient:
         ],
         *,
         temp_guid: Annotated[
-            UUID4,
+            str | None,
             Field(
                 description=(
                     "A unique identifier for the message. This is to prevent duplicate "
-                    "messages from being sent."
+                    "messages from being sent. Generated when not provided."
                 ),
             ),
-        ] = Field(default_factory=uuid4),  # noqa: B008
+        ] = None,
         method: Annotated[
-            Literal["private-api", "apple-script"],
+            SendMethod,
             Field(
                 description="Method to send the message using. Defaults to private-api.",
             ),
@@ -56,22 +79,7 @@ class MessageClient:
             Field(description="Send a subject with the message. Requires private-api."),
         ] = None,
         effect_id: Annotated[
-            Literal[
-                "com.apple.MobileSMS.expressivesend.gentle",
-                "com.apple.MobileSMS.expressivesend.impact",
-                "com.apple.MobileSMS.expressivesend.invisibleink",
-                "com.apple.MobileSMS.expressivesend.loud",
-                "com.apple.messages.effect.CKConfettiEffect",
-                "com.apple.messages.effect.CKEchoEffect",
-                "com.apple.messages.effect.CKFireworksEffect",
-                "com.apple.messages.effect.CKHappyBirthdayEffect",
-                "com.apple.messages.effect.CKHeartEffect",
-                "com.apple.messages.effect.CKLasersEffect",
-                "com.apple.messages.effect.CKShootingStarEffect",
-                "com.apple.messages.effect.CKSparklesEffect",
-                "com.apple.messages.effect.CKSpotlightEffect",
-            ]
-            | None,
+            EffectId | None,
             Field(description="Send a message using an effect. Requires private-api."),
         ] = None,
         selected_message_guid: Annotated[
@@ -86,32 +94,36 @@ class MessageClient:
         ] = 0,
     ) -> httpx.Response:
         """Send a message to BlueBubbles."""
-        url: str = f"{self.client.url}/message/text"
-        params: dict[str, str] = self.client.get_auth_params()
-        data: dict[str, Any] = camelize(
-            {
-                "chatGuid": chat_guid,
-                "message": message,
-                "tempGuid": str(temp_guid),
-                "method": method,
-                "subject": subject,
-                "effectId": effect_id,
-                "selected_message_guid": selected_message_guid,
-                "partIndex": part_index,
-            },
-        )
+        method = _METHOD_ADAPTER.validate_python(method)
+        if effect_id is not None:
+            effect_id = _EFFECT_ID_ADAPTER.validate_python(effect_id)
+        if temp_guid is None:
+            temp_guid = next_temp_guid()
+
+        url: str = "/message/text"
+        params: Mapping[str, str] = self.client.get_auth_params()
+        data: dict[str, Any] = {
+            "chatGuid": chat_guid,
+            "message": message,
+            "tempGuid": temp_guid,
+            "method": method,
+            "subject": subject,
+            "effectId": effect_id,
+            "selectedMessageGuid": selected_message_guid,
+            "partIndex": part_index,
+        }
 
-        log.debug(
-            "Sending message to BlueBubbles",
-            url=url,
-            params=params,
-            data=data,
-        )
+        if LOG_LEVEL <= logging.DEBUG:
+            log.debug(
+                "Sending message to BlueBubbles",
+                url=url,
+                data=data,
+            )
         try:
-            response: httpx.Response = self.client.http_client.post(
+            response: httpx.Response = await self.client.http_client.post(
                 url,
                 params=params,
-                json=data,
+                content=orjson.dumps(data),
             )
             response.raise_for_status()
         except httpx.RequestError as exc:
@@ -126,5 +138,5 @@ class MessageClient:
             )
             raise
 
-        log.info("Message sent", response=response)
+        log.info("Message sent", status=response.status_code)
         return response
@@ -1,16 +1,22 @@
 """Core logic."""
 
-from datetime import datetime, timezone
-from typing import Annotated, LiteralString
+import asyncio
+import time
+from collections.abc import AsyncIterator, Mapping
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from datetime import datetime
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, LiteralString
 from zoneinfo import ZoneInfo
 
-import httpx
-from fastapi import Body, FastAPI, Request
-from fastapi.exception_handlers import (
-    request_validation_exception_handler,
-)
+import msgspec
+import orjson
+import structlog
+from fastapi import BackgroundTasks, FastAPI, Request, status
+from fastapi.encoders import jsonable_encoder
 from fastapi.exceptions import RequestValidationError
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse, PlainTextResponse
 from google import genai
 from google.genai.types import (
     GenerateContentConfig,
@@ -19,37 +25,67 @@ from google.genai.types import (
     SafetySetting,
     Tool,
 )
+from pydantic import ValidationError
 
 from app.clients.bb import BBClient
 from app.logger import log
-from app.models.bb.api import (
+from app.models.bb.api import webhook_adapter
+from app.models.bb.fast import (
+    Webhook,
     WebhookChatReadStatusChanged,
     WebhookNewMessage,
     WebhookTypingIndicator,
     WebhookUpdatedMessage,
+    envelope_decoder,
+    webhook_decoder,
 )
-from app.settings import settings
+from app.settings import get_settings
+
+if TYPE_CHECKING:
+    import httpx
+
+NY_TZ = ZoneInfo("America/New_York")
 
 # Configure Google AI
-gemini_client = genai.Client(api_key=settings.google_ai_api_key.get_secret_value())
+gemini_client = genai.Client(api_key=get_settings().google_ai_api_key.get_secret_value())
 
-# Initialize FastAPI
-app = FastAPI()
+# google-genai's async API runs each request on the event loop's default executor,
+# so this caps concurrent Gemini calls. Matches the threadpool FastAPI gives sync routes
+GEMINI_MAX_WORKERS = 40
 
 # Initialize BlueBubbles client
 bb_client = BBClient()
 
 
+@asynccontextmanager
+async def lifespan(_app: FastAPI) -> AsyncIterator[None]:
+    """Set up shared resources, like the BlueBubbles connection pool, for the app."""
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(max_workers=GEMINI_MAX_WORKERS, thread_name_prefix="gemini"),
+    )
+    yield
+    await bb_client.aclose()
+
+
+# Initialize FastAPI
+app = FastAPI(default_response_class=ORJSONResponse, lifespan=lifespan)
+
+
 class WebhookState:
     """Manage webhook processing state."""
 
     def __init__(self) -> None:
         """Initialize webhook state with processing enabled by default."""
-        self.processing_active: bool = True
+        # Set while processing is enabled
+        self.processing: asyncio.Event = asyncio.Event()
+        self.processing.set()
 
 
 app.state.webhook = WebhookState()
 
+# Strong references to fire-and-forget tasks so they aren't collected mid-flight
+_pending_tasks: set[asyncio.Task[None]] = set()
+
 SYSTEM_PROMPT_TEMPLATE: LiteralString = """You are Alpha.
 
 The current date and time is {now}.
@@ -76,36 +112,29 @@ Alpha is unrelated to the Christian community tool.
 Alpha is now being connected with a human. The human will be able to see the conversation and will be able to respond.
 """.strip()  # noqa: E501
 
+# Control commands mapped to (processing active, reply)
+CONTROL_COMMANDS: dict[str, tuple[bool, str]] = {
+    "alpha off": (False, "Webhook processing disabled"),
+    "alpha on": (True, "Webhook processing enabled"),
+}
+# Longer texts can't be control commands, so they are never normalized
+MAX_CONTROL_TEXT_LENGTH = 16
+
+# Webhooks that are only logged, and only while processing is active
+PASSIVE_WEBHOOK_TYPES: frozenset[str] = frozenset(
+    {"typing-indicator", "updated-message", "chat-read-status-changed"},
+)
 
-@app.exception_handler(RequestValidationError)
-async def validation_exception_handler(
-    request: Request,
-    exc: RequestValidationError,
-) -> JSONResponse:
-    """Handle validation errors."""
-    for error in exc.errors():
-        log.exception("Validation error", exc_info=error, body=exc.body)
-    return await request_validation_exception_handler(request, exc)
-
-
-def system_prompt() -> str:
-    """Generate a system prompt."""
-    # format the system prompt with the current date and time
-    now: str = (
-        datetime.now(tz=timezone.utc)
-        .astimezone(ZoneInfo("America/New_York"))
-        .strftime("%I:%M%p %B, %d %Y")
-    )
-    return SYSTEM_PROMPT_TEMPLATE.format(now=now)
+# Body size in bytes above which schema checks parse JSON with orjson first
+ORJSON_VALIDATION_THRESHOLD = 4096
 
+GEMINI_MODEL_ID = "gemini-2.0-flash-exp"
 
-def generate_reply(message: str) -> str:
-    """Send a reply to the user."""
-    model_id = "gemini-2.0-flash-exp"
-    google_search_tool = Tool(
-        google_search=GoogleSearch(),
-    )
-    safety_settings = [
+# Static Gemini request config; only the system instruction changes per call
+GEMINI_CONFIG = GenerateContentConfig(
+    tools=[Tool(google_search=GoogleSearch())],
+    response_modalities=["TEXT"],
+    safety_settings=[
         SafetySetting(
             category="HARM_CATEGORY_HATE_SPEECH",
             threshold="OFF",
@@ -126,16 +155,52 @@ def generate_reply(message: str) -> str:
             category="HARM_CATEGORY_CIVIC_INTEGRITY",
             threshold="OFF",
         ),
-    ]
-    config = GenerateContentConfig(
-        tools=[google_search_tool],
-        system_instruction=system_prompt(),
-        response_modalities=["TEXT"],
-        safety_settings=safety_settings,
+    ],
+)
+
+
+@app.exception_handler(RequestValidationError)
+async def validation_exception_handler(
+    _request: Request,
+    exc: RequestValidationError,
+) -> ORJSONResponse:
+    """Handle validation errors."""
+    for error in exc.errors():
+        log.exception("Validation error", exc_info=error, body=exc.body)
+    return ORJSONResponse(
+        status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+        content={"detail": jsonable_encoder(exc.errors())},
+    )
+
+
+@lru_cache(maxsize=1)
+def _system_prompt_for_minute(minute: int) -> str:
+    """Format the system prompt for a given minute since the epoch."""
+    now: str = datetime.fromtimestamp(minute * 60, tz=NY_TZ).strftime("%I:%M%p %B, %d %Y")
+    return SYSTEM_PROMPT_TEMPLATE.format(now=now)
+
+
+@lru_cache(maxsize=1)
+def _gemini_config_for_minute(minute: int) -> GenerateContentConfig:
+    """Build the Gemini request config for a given minute since the epoch."""
+    return GEMINI_CONFIG.model_copy(
+        update={"system_instruction": _system_prompt_for_minute(minute)},
     )
 
-    gemini_response: GenerateContentResponse = gemini_client.models.generate_content(
-        model=model_id,
+
+def gemini_config() -> GenerateContentConfig:
+    """Get the Gemini request config with the current system prompt."""
+    # The prompt only shows the time to the minute, so every request in the same
+    # minute shares one config; the SDK only reads it
+    return _gemini_config_for_minute(int(time.time()) // 60)
+
+
+async def generate_reply(message: str) -> str:
+    """Send a reply to the user."""
+    config: GenerateContentConfig = gemini_config()
+
+    gemini_response: GenerateContentResponse = await gemini_client.aio.models.generate_content(
+        model=GEMINI_MODEL_ID,
         contents=message,
         config=config,
     )
@@ -149,57 +214,97 @@ def generate_reply(message: str) -> str:
     return text
 
 
-def mark_as_read(chat_guid: str) -> None:
+async def mark_as_read(chat_guid: str) -> None:
     """Mark a chat as read."""
-    url: str = f"{settings.bb_url}/chat/{chat_guid}/read"
-    params: dict[str, str] = {"password": settings.bb_password.get_secret_value()}
-    response: httpx.Response = httpx.post(url, params=params)
-    log.info("Chat marked as read", response=response)
+    url: str = f"/chat/{chat_guid}/read"
+    params: Mapping[str, str] = bb_client.get_auth_params()
+    response: httpx.Response = await bb_client.http_client.post(url, params=params)
+    log.info("Chat marked as read", status=response.status_code)
+
+
+def _on_mark_as_read_done(task: asyncio.Task[None]) -> None:
+    """Release a finished mark-as-read task and log its failure, if any."""
+    _pending_tasks.discard(task)
+    if not task.cancelled() and (exc := task.exception()):
+        log.exception("Marking chat as read failed", exc_info=exc)
 
 
-def _handle_control_message(chat_guid: str, text: str) -> str | None:
+async def _handle_control_message(chat_guid: str, text: str) -> str | None:
     """Handle control messages like 'alpha off' and 'alpha on'."""
-    if text == "alpha off":
-        if settings.env == "production":
-            app.state.webhook.processing_active = False
-        bb_client.message.send_text(chat_guid, "Webhook processing disabled")
-        return "OK"
+    command: tuple[bool, str] | None = CONTROL_COMMANDS.get(text)
+    if command is None:
+        return None
+
+    processing_active, reply = command
+    if get_settings().env == "production":
+        if processing_active:
+            app.state.webhook.processing.set()
+        else:
+            app.state.webhook.processing.clear()
+    await bb_client.message.send_text(chat_guid, reply)
+    return "OK"
 
-    if text == "alpha on":
-        if settings.env == "production":
-            app.state.webhook.processing_active = True
-        bb_client.message.send_text(chat_guid, "Webhook processing enabled")
-        return "OK"
 
-    return None
+async def _reply_and_send(chat_guid: str, text: str) -> None:
+    """Generate a reply to a message and send it, reporting failures to the chat."""
+    try:
+        message: str = await generate_reply(text)
+        # Drop the reply if processing was turned off while it was being generated
+        if not app.state.webhook.processing.is_set():
+            log.info("Processing disabled, dropping generated reply")
+            return
+        await bb_client.message.send_text(chat_guid, message)
+    # The webhook response has already gone out, so report failures rather than raise
+    except Exception as exc:  # noqa: BLE001
+        log.exception("Error replying to message", exc_info=exc)
+        try:
+            await bb_client.message.send_text(
+                chat_guid,
+                f"Sorry, I encountered an error:\n\n{exc!s}",
+            )
+        except Exception:  # noqa: BLE001
+            log.exception("Failed to send error message", exc_info=exc)
 
 
-def handle_new_message(payload: WebhookNewMessage) -> str:
+async def handle_new_message(
+    payload: WebhookNewMessage,
+    background_tasks: BackgroundTasks,
+) -> str:
     """Handle incoming new message webhooks."""
     try:
-        text: str = payload.data.text.strip().lower()
+        raw_text: str = payload.data.text
+        text: str = raw_text.strip().lower() if len(raw_text) <= MAX_CONTROL_TEXT_LENGTH else ""
         if not payload.data.chats:
             log.warning("No chat found in payload", payload=payload)
             return "Error"
         chat_guid: str = payload.data.chats[0].guid
+        structlog.contextvars.bind_contextvars(chat_guid=chat_guid)
 
         # Handle control messages first
-        if control_result := _handle_control_message(chat_guid, text):
+        if text and (control_result := await _handle_control_message(chat_guid, text)):
             return control_result
 
-        mark_as_read(chat_guid)
+        # Overlap the read receipt with reply generation instead of waiting on it
+        task: asyncio.Task[None] = asyncio.create_task(mark_as_read(chat_guid))
+        _pending_tasks.add(task)
+        task.add_done_callback(_on_mark_as_read_done)
 
         # Skip processing for empty messages, inactive state, or self-messages
-        if not text or not app.state.webhook.processing_active or payload.data.is_from_me:
+        if (
+            not raw_text
+            or raw_text.isspace()
+            or not app.state.webhook.processing.is_set()
+            or payload.data.is_from_me
+        ):
             return "OK"
 
-        message: str = generate_reply(payload.data.text)
-        bb_client.message.send_text(chat_guid, message)
+        # Reply after responding, so BlueBubbles isn't kept waiting on Gemini
+        background_tasks.add_task(_reply_and_send, chat_guid, raw_text)
 
     except Exception as exc:
         log.exception("Error processing new message", exc_info=exc)
         try:
-            bb_client.message.send_text(
+            await bb_client.message.send_text(
                 chat_guid,
                 f"Sorry, I encountered an error:\n\n{exc!s}",
             )
@@ -211,31 +316,82 @@ def handle_new_message(payload: WebhookNewMessage) -> str:
     return "OK"
 
 
-@app.post("/webhook")
-def post_webhook(
-    payload: Annotated[
-        WebhookNewMessage
-        | WebhookTypingIndicator
-        | WebhookUpdatedMessage
-        | WebhookChatReadStatusChanged,
-        Body(
-            ...,
-            discriminator="type",
-        ),
-    ],
-) -> str:
-    """Incoming webhooks from BlueBubbles."""
-    if isinstance(payload, WebhookNewMessage):
-        return handle_new_message(payload)
+def _validate_webhook(body: bytes) -> None:
+    """Validate a webhook body against the full model named by its `type`."""
+    adapter = webhook_adapter()
+    try:
+        if len(body) <= ORJSON_VALIDATION_THRESHOLD:
+            adapter.validate_json(body)
+        else:
+            # pydantic-core's JSON parser is slow on the large opaque dicts some
+            # messages carry, so hand big bodies to orjson first
+            try:
+                data: Any = orjson.loads(body)
+            except orjson.JSONDecodeError:
+                # Let pydantic report malformed JSON, so the error matches small bodies
+                adapter.validate_json(body)
+            else:
+                adapter.validate_python(data)
+    except ValidationError as exc:
+        # Inputs can be raw body bytes, which can't be encoded into the response
+        raise RequestValidationError(
+            exc.errors(include_input=False),
+            body=body,
+        ) from exc
+
+
+def _webhook_type(body: bytes) -> str | None:
+    """Read just the `type` of a webhook body, or `None` if it can't be read."""
+    try:
+        return envelope_decoder.decode(body).type
+    except (msgspec.DecodeError, UnicodeDecodeError):
+        return None
 
-    if app.state.webhook.processing_active:
-        if isinstance(payload, WebhookTypingIndicator):
-            log.info("Typing indicator", is_typing=payload.data.display, payload=payload)
 
-        if isinstance(payload, WebhookUpdatedMessage):
-            log.info("Updated message", payload=payload)
+def _parse_webhook(body: bytes) -> Webhook:
+    """Decode a webhook body into the struct named by its `type`."""
+    # BlueBubbles is a trusted upstream, so only check the full schema outside
+    # production, where drift in its payloads should surface as a 422
+    if get_settings().env != "production":
+        _validate_webhook(body)
 
-        if isinstance(payload, WebhookChatReadStatusChanged):
-            log.info("Chat read status changed", read=payload.data.read, payload=payload)
+    try:
+        return webhook_decoder.decode(body)
+    # msgspec reports invalid UTF-8 inside strings as a UnicodeDecodeError
+    except (msgspec.DecodeError, UnicodeDecodeError) as exc:
+        raise RequestValidationError(
+            [{"type": "value_error", "loc": ("body",), "msg": str(exc)}],
+            body=body,
+        ) from exc
 
-    return "OK"
+
+@app.post("/webhook", response_class=PlainTextResponse)
+async def post_webhook(
+    request: Request,
+    background_tasks: BackgroundTasks,
+) -> PlainTextResponse:
+    """Incoming webhooks from BlueBubbles."""
+    body: bytes = await request.body()
+
+    # Passive events make up most webhook traffic; drop them before any
+    # validation or decoding when nothing would be logged
+    if not app.state.webhook.processing.is_set() and _webhook_type(body) in PASSIVE_WEBHOOK_TYPES:
+        return PlainTextResponse("OK")
+
+    payload: Webhook = _parse_webhook(body)
+    structlog.contextvars.clear_contextvars()
+    structlog.contextvars.bind_contextvars(webhook_type=payload.__struct_config__.tag)
+
+    if isinstance(payload, WebhookNewMessage):
+        return PlainTextResponse(await handle_new_message(payload, background_tasks))
+
+    if app.state.webhook.processing.is_set():
+        match payload:
+            case WebhookTypingIndicator():
+                log.info("Typing indicator", is_typing=payload.data.display, payload=payload)
+            case WebhookUpdatedMessage():
+                log.info("Updated message", payload=payload)
+            case WebhookChatReadStatusChanged():
+                log.info("Chat read status changed", read=payload.data.read, payload=payload)
+
+    return PlainTextResponse("OK")
@@ -1,5 +1,14 @@
 """Logger configuration."""
 
+import logging
+
 import structlog
 
+from app.settings import get_settings
+
+# Check against this before building expensive context for debug-only log calls
+LOG_LEVEL: int = logging.INFO if get_settings().env == "production" else logging.DEBUG
+
+structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(LOG_LEVEL))
+
 log: structlog.stdlib.BoundLogger = structlog.get_logger()
@@ -1,25 +1,40 @@
 """Pydantic models for incoming webhooks from BB."""
 
+import os
+from collections import deque
 from datetime import datetime
-from typing import Any, Literal
-from uuid import UUID, uuid4
+from functools import cache
+from typing import Annotated, Any, Literal
+from uuid import UUID
 
 from humps import camelize
-from pydantic import UUID4, BaseModel, ConfigDict, Field
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter
 
 # Base models
 
 
+# Aliases BlueBubbles spells differently from what camelize produces
+_ALIAS_OVERRIDES: dict[str, str] = {"original_rowid": "originalROWID"}
+
+
+@cache
+def _alias(name: str) -> str:
+    """Get the camelCase alias for a field name, computed once per name."""
+    return _ALIAS_OVERRIDES.get(name) or camelize(name)
+
+
 class BaseBBModel(BaseModel):
     """Base model for BB models."""
 
-    model_config = ConfigDict(alias_generator=camelize, populate_by_name=True)
+    # Payloads are read-only. Schemas are built on first use; production decodes
+    # webhooks with msgspec and never needs most of them
+    model_config = ConfigDict(alias_generator=_alias, frozen=True, defer_build=True)
 
 
 class Handle(BaseBBModel):
     """Handle model."""
 
-    original_rowid: int = Field(alias="originalROWID")
+    original_rowid: int
     address: str
     service: str
     uncanonicalized_id: str | None
@@ -29,7 +44,7 @@ class Handle(BaseBBModel):
 class Chat(BaseBBModel):
     """Chat model."""
 
-    original_rowid: int = Field(alias="originalROWID")
+    original_rowid: int
     guid: str
     style: int
     chat_identifier: str
@@ -48,8 +63,8 @@ class AttachmentMetadata(BaseBBModel):
 class Attachmemt(BaseBBModel):
     """Attachment model."""
 
-    original_rowid: int = Field(alias="originalROWID")
-    guid: UUID
+    original_rowid: int
+    guid: str
     uti: str
     mime_type: str | None = None
     transfer_name: str
@@ -62,8 +77,8 @@ class Attachmemt(BaseBBModel):
 class Message(BaseBBModel):
     """Base webhook data model."""
 
-    original_rowid: int = Field(alias="originalROWID")
-    guid: UUID
+    original_rowid: int
+    guid: str
     text: str
     attributed_body: str | None
     handle: Handle
@@ -110,8 +125,9 @@ class Message(BaseBBModel):
     date_edited: int | None = None
     date_retracted: int | None = None
     part_count: int | None = None
-    message_summary_info: dict | None = None
-    payload_data: dict | None = None
+    # Opaque pass-through data; never read, so its contents aren't checked
+    message_summary_info: Any | None = None
+    payload_data: Any | None = None
 
 
 # Webhook models
@@ -159,16 +175,52 @@ class WebhookChatReadStatusChanged(BaseBBModel):
     data: WebhookChatReadStatusChangedData
 
 
+Webhook = (
+    WebhookNewMessage
+    | WebhookTypingIndicator
+    | WebhookUpdatedMessage
+    | WebhookChatReadStatusChanged
+)
+
+
+@cache
+def webhook_adapter() -> TypeAdapter[Webhook]:
+    """Get a validator for any webhook, dispatching on its `type` in pydantic-core.
+
+    Built on first use, like the models' own schemas.
+    """
+    return TypeAdapter(Annotated[Webhook, Field(discriminator="type")])
+
+
 # API request models
 
+TEMP_GUID_BATCH_SIZE = 1024
+
+_temp_guids: deque[str] = deque()
+
+
+def next_temp_guid() -> str:
+    """Get a random version 4 UUID string to use as a message's `tempGuid`.
+
+    UUIDs are drawn in batches from a single `os.urandom` read instead of one
+    read per message.
+    """
+    if not _temp_guids:
+        data: bytes = os.urandom(16 * TEMP_GUID_BATCH_SIZE)
+        _temp_guids.extend(
+            str(UUID(bytes=data[i : i + 16], version=4)) for i in range(0, len(data), 16)
+        )
+    return _temp_guids.popleft()
+
 
-class Text(BaseModel):
+class Text(BaseBBModel):
     """Text model."""
 
-    model_config = ConfigDict(alias_generator=camelize, populate_by_name=True)
+    # Built in code by field name rather than parsed from BlueBubbles' camelCase
+    model_config = ConfigDict(populate_by_name=True)
 
     chat_guid: str
-    temp_guid: UUID4 = Field(default_factory=uuid4)
+    temp_guid: str = Field(default_factory=next_temp_guid)
     message: str
     method: Literal["private-api", "apple-script"] = "private-api"
     subject: str | None = None
@@ -0,0 +1,86 @@
+"""msgspec structs for decoding incoming webhooks from BB.
+
+Only the fields the webhook handlers read are declared, so msgspec skips the rest
+of each payload without building Python objects for it. The Pydantic models in
+`app.models.bb.api` remain the full description of the payloads.
+"""
+
+import msgspec
+
+
+class Chat(msgspec.Struct, rename="camel"):
+    """Chat struct."""
+
+    guid: str
+
+
+class Message(msgspec.Struct, rename="camel"):
+    """Message struct."""
+
+    text: str
+    is_from_me: bool
+    chats: list[Chat] | None = None
+
+
+# Webhook structs
+
+
+class BaseWebhook(msgspec.Struct, tag_field="type"):
+    """Base struct for webhooks, tagged by their `type`."""
+
+
+class WebhookNewMessage(BaseWebhook, tag="new-message"):
+    """Webhook struct for new messages."""
+
+    data: Message
+
+
+class WebhookUpdatedMessage(BaseWebhook, tag="updated-message"):
+    """Webhook struct for updated messages."""
+
+    data: Message
+
+
+class WebhookTypingIndicatorData(msgspec.Struct, rename="camel"):
+    """Webhook data struct for typing indicators."""
+
+    display: bool
+    guid: str
+
+
+class WebhookTypingIndicator(BaseWebhook, tag="typing-indicator"):
+    """Webhook struct for typing indicators."""
+
+    data: WebhookTypingIndicatorData
+
+
+class WebhookChatReadStatusChangedData(msgspec.Struct, rename="camel"):
+    """Webhook data struct for chat read status changed."""
+
+    chat_guid: str
+    read: bool
+
+
+class WebhookChatReadStatusChanged(BaseWebhook, tag="chat-read-status-changed"):
+    """Webhook struct for chat read status changed."""
+
+    data: WebhookChatReadStatusChangedData
+
+
+class WebhookEnvelope(msgspec.Struct):
+    """Just the `type` of a webhook, for routing before decoding the rest."""
+
+    type: str
+
+
+Webhook = (
+    WebhookNewMessage
+    | WebhookTypingIndicator
+    | WebhookUpdatedMessage
+    | WebhookChatReadStatusChanged
+)
+
+webhook_decoder: msgspec.json.Decoder[Webhook] = msgspec.json.Decoder(Webhook)
+envelope_decoder: msgspec.json.Decoder[WebhookEnvelope] = msgspec.json.Decoder(
+    WebhookEnvelope,
+)
@@ -1,9 +1,22 @@
 """Application settings."""
 
-from pydantic import AliasChoices, Field, HttpUrl, SecretStr
+from functools import lru_cache
+from typing import Annotated
+from urllib.parse import urlparse
+
+from pydantic import AfterValidator, AliasChoices, Field, SecretStr
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
+def _validate_http_url(url: str) -> str:
+    """Check that a URL is an absolute http(s) URL."""
+    parsed = urlparse(url)
+    if parsed.scheme not in ("http", "https") or not parsed.netloc:
+        msg = f"URL must be an absolute http or https URL, got {url!r}"
+        raise ValueError(msg)
+    return url
+
+
 class Settings(BaseSettings):
     """Settings class for managing environment variables and configuration."""
 
@@ -12,9 +25,12 @@ class Settings(BaseSettings):
     google_ai_api_key: SecretStr = Field(
         validation_alias=AliasChoices("GOOGLE_AI_API_KEY", "GOOGLE_AI_PAID_API_KEY"),
     )
-    bb_url: HttpUrl
+    bb_url: Annotated[str, AfterValidator(_validate_http_url)]
     bb_password: SecretStr
     env: str
 
 
-settings = Settings()  # pyright: ignore [reportCallIssue]
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Get the application settings, read from the environment on first use."""
+    return Settings()  # pyright: ignore [reportCallIssue]